@@ -1,8 +1,11 @@
+import io
 import os
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from pathlib import Path
 
 # ============================================================
@@ -13,6 +16,7 @@ DATA_DIR = BASE_DIR / "data"
 
 RAW_PATH = str(DATA_DIR / "NOAA Earthquaqe since 1600.csv")
 CLEAN_PATH = str(DATA_DIR / "earthquakes_clean.csv")
+CLEAN_PARQUET_PATH = str(DATA_DIR / "earthquakes_clean.parquet")
 
 st.set_page_config(
     page_title="MCI Simulation Dashboard",
@@ -152,11 +156,12 @@ st.markdown(
 # ============================================================
 # 3) DATA PROCESSING
 # ============================================================
-def auto_clean_raw_to_csv(raw_path: str, clean_path: str) -> None:
+def auto_clean_raw_to_csv(raw_path: str, clean_path: str, parquet_path: str) -> None:
     """
-    Clean NOAA raw CSV and create a cleaned CSV used by the app.
+    Clean NOAA raw CSV and create the cleaned CSV + Parquet used by the app.
     - Detects tsunami column automatically and keeps it in output.
     - Standardizes column names and types.
+    - Parquet keeps the dtypes, so the app loads it without re-parsing.
     """
     if not os.path.exists(raw_path):
         raise FileNotFoundError(f"NOAA CSV not found: {raw_path}")
@@ -194,7 +199,13 @@ def auto_clean_raw_to_csv(raw_path: str, clean_path: str) -> None:
 
     df["month"] = df["month"].fillna(1).astype(int)
     df["day"] = df["day"].fillna(1).astype(int)
-    df["date"] = pd.to_datetime(dict(year=df["year"], month=df["month"], day=df["day"]), errors="coerce")
+    # One ISO string per row + explicit format keeps to_datetime on its fast C parser
+    iso = (
+        df["year"].astype("Int64").astype(str).str.zfill(4)
+        + "-" + df["month"].astype(str).str.zfill(2)
+        + "-" + df["day"].astype(str).str.zfill(2)
+    )
+    df["date"] = pd.to_datetime(iso, format="%Y-%m-%d", errors="coerce", cache=True)
 
     df["location_name"] = df.get("location_name", "Unknown").astype(str).str.strip()
 
@@ -203,20 +214,13 @@ def auto_clean_raw_to_csv(raw_path: str, clean_path: str) -> None:
     df["total_casualties"] = df["deaths"] + df["injuries"]
 
     if "tsunami_flag" in df.columns:
-        df["tsunami_flag"] = (
-            df["tsunami_flag"]
-            .astype(str)
-            .str.strip()
-            .str.lower()
-            .replace({
-                "y": 1, "yes": 1, "true": 1, "1": 1, "t": 1,
-                "n": 0, "no": 0, "false": 0, "0": 0, "f": 0,
-                "nan": 0, "none": 0, "": 0
-            })
-        )
-        df["tsunami_flag"] = pd.to_numeric(df["tsunami_flag"], errors="coerce").fillna(0).astype(int)
+        # Anything not recognised as truthy (no, 0, blank, NaN, ...) becomes 0
+        flags = df["tsunami_flag"].astype("string").str.strip().str.lower().to_numpy(dtype=object, na_value="")
+        truthy = np.isin(flags, ["y", "yes", "true", "t", "1", "1.0"])
+        df["tsunami_flag"] = truthy.astype("int8")
 
     df = df.dropna(subset=["date", "year", "latitude", "longitude", "magnitude", "depth_km"])
+    df["year"] = df["year"].astype(int)
 
     final_cols = [
         "event_id", "date", "year", "location_name",
@@ -227,30 +231,59 @@ def auto_clean_raw_to_csv(raw_path: str, clean_path: str) -> None:
 
     os.makedirs(os.path.dirname(clean_path), exist_ok=True)
     df.to_csv(clean_path, index=False)
+    df.to_parquet(parquet_path, index=False)
 
-@st.cache_data
-def load_data(clean_path: str) -> pd.DataFrame:
-    df = pd.read_csv(clean_path)
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+SEVERITY_LEVELS = ["Minor", "Moderate", "Severe"]
 
-    numeric_cols = ["year", "latitude", "longitude", "magnitude", "depth_km", "deaths", "injuries", "total_casualties"]
-    for c in numeric_cols:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors="coerce")
+def classify_severity(total: pa.ChunkedArray) -> pa.DictionaryArray:
+    # Vectorized: >= 1000 Severe, >= 100 Moderate, otherwise Minor
+    tc = total.to_numpy()
+    codes = np.select([tc >= 1000, tc >= 100], [2, 1], default=0).astype(np.int8)
+    return pa.DictionaryArray.from_arrays(codes, SEVERITY_LEVELS)
 
-    df = df.dropna(subset=["date", "year", "latitude", "longitude", "magnitude", "depth_km"])
-    df["year"] = df["year"].astype(int)
+@st.cache_resource
+def load_table(parquet_path: str) -> pa.Table:
+    """
+    Load the cleaned Parquet artifact once as a read-only Arrow table.
+    - cache_resource shares it across sessions without pickling a copy per rerun.
+    - Filtered pandas frames are built from it on demand (see apply_filters).
+    """
+    # The cleaner already dropped incomplete rows and coerced types; the artifact is trusted as-is
+    tbl = pq.read_table(parquet_path)
+
+    # Narrow dtypes: filters and groupbys are memory-bound, so fewer bytes per row is faster
+    types = {
+        "year": pa.int16(),
+        "magnitude": pa.float32(),
+        "depth_km": pa.float32(),
+        "latitude": pa.float32(),
+        "longitude": pa.float32(),
+        "deaths": pa.int32(),
+        "injuries": pa.int32(),
+        "total_casualties": pa.int32(),
+        "tsunami_flag": pa.int8(),
+    }
+    for name, typ in types.items():
+        if name in tbl.column_names:
+            tbl = tbl.set_column(tbl.schema.get_field_index(name), name, tbl[name].cast(typ))
+    if "location_name" in tbl.column_names:
+        i = tbl.schema.get_field_index("location_name")
+        tbl = tbl.set_column(i, "location_name", tbl["location_name"].dictionary_encode())
 
-    if "tsunami_flag" in df.columns:
-        df["tsunami_flag"] = pd.to_numeric(df["tsunami_flag"], errors="coerce").fillna(0).astype(int)
+    # Stable sort keeps date order within a year; the year span is then a contiguous slice
+    tbl = tbl.sort_by("year")
 
-    return df
+    # Computed once here so widget reruns reuse the cached column
+    tbl = tbl.append_column("severity", classify_severity(tbl["total_casualties"]))
 
-if not os.path.exists(CLEAN_PATH):
-    auto_clean_raw_to_csv(RAW_PATH, CLEAN_PATH)
+    return tbl.combine_chunks()
+
+if not os.path.exists(CLEAN_PARQUET_PATH):
+    auto_clean_raw_to_csv(RAW_PATH, CLEAN_PATH, CLEAN_PARQUET_PATH)
     st.cache_data.clear()
+    st.cache_resource.clear()
 
-df = load_data(CLEAN_PATH)
+tbl = load_table(CLEAN_PARQUET_PATH)
 
 # ============================================================
 # 4) HEADER
@@ -274,15 +307,6 @@ with header_col:
 # ============================================================
 # 5) FILTERS (Control panel on main page)
 # ============================================================
-def classify_severity(total: int) -> str:
-    if total >= 1000:
-        return "Severe"
-    if total >= 100:
-        return "Moderate"
-    return "Minor"
-
-df["severity"] = df["total_casualties"].apply(classify_severity)
-
 controls_col, display_col = st.columns([1, 3], gap="medium")
 
 with controls_col:
@@ -290,21 +314,22 @@ with controls_col:
 
     magnitude = st.slider("Target Magnitude", 3.0, 9.0, 6.5, 0.1)
 
+    year_min, year_max = (int(v) for v in pc.min_max(tbl["year"]).values())
     year_range = st.slider(
         "Year Span",
-        int(df["year"].min()),
-        int(df["year"].max()),
-        (1900, int(df["year"].max()))
+        year_min,
+        year_max,
+        (1900, year_max)
     )
 
-    has_tsunami = "tsunami_flag" in df.columns
+    has_tsunami = "tsunami_flag" in tbl.column_names
     event_type = st.selectbox(
         "Event Category",
         ["All earthquakes", "Earthquake only", "Earthquake + Tsunami"] if has_tsunami else ["All earthquakes", "Earthquake only"]
     )
 
     st.write("Severity Impact")
-    options = ["Minor", "Moderate", "Severe"]
+    options = SEVERITY_LEVELS
 
     # Initialize state once
     for opt in options:
@@ -329,62 +354,260 @@ with controls_col:
 # ============================================================
 mag_window = 0.25
 
-f = df[
-    (df["year"] >= year_range[0]) & (df["year"] <= year_range[1]) &
-    (df["magnitude"].between(magnitude - mag_window, magnitude + mag_window)) &
-    (df["severity"].isin(severity_filter))
-].copy()
+@st.cache_data
+def apply_filters(year_range: tuple, magnitude: float, severities: tuple,
+                  only_with_casualties: bool, event_type: str) -> tuple:
+    """
+    Filter the loaded table for the current widget values.
+    Returns (f, matched). When nothing matches, f is a single zeroed row
+    so the visuals still render.
+    """
+    mag_lo = magnitude - mag_window
+    mag_hi = magnitude + mag_window
+
+    # tbl is sorted by year (see load_table): binary-search the year span instead of masking it
+    lo, hi = np.searchsorted(tbl["year"].to_numpy(), [year_range[0], year_range[1] + 1])
+    t = tbl.slice(lo, hi - lo)
+
+    # Arrow compute kernels build the mask on the zero-copy slice
+    mask = pc.and_(
+        pc.and_(pc.greater_equal(t["magnitude"], mag_lo), pc.less_equal(t["magnitude"], mag_hi)),
+        pc.is_in(t["severity"], value_set=pa.array(severities, pa.string()))
+    )
 
-if only_with_casualties:
-    f = f[f["total_casualties"] > 0]
+    if only_with_casualties:
+        mask = pc.and_(mask, pc.greater(t["total_casualties"], 0))
+
+    if has_tsunami:
+        if "only" in event_type.lower():
+            mask = pc.and_(mask, pc.equal(t["tsunami_flag"], 0))
+        elif "tsunami" in event_type.lower():
+            mask = pc.and_(mask, pc.equal(t["tsunami_flag"], 1))
+
+    # Only the matching rows are converted to pandas
+    f = t.filter(mask).to_pandas()
+
+    if not f.empty:
+        return f, True
+
+    f = pd.DataFrame({
+        "year": [year_range[0]],
+        "latitude": [0],
+        "longitude": [0],
+        "magnitude": [magnitude],
+        "depth_km": [0],
+        "deaths": [0],
+        "injuries": [0],
+        "total_casualties": [0],
+        "severity": ["Minor"],
+        "location_name": ["No data"]
+    })
+    if has_tsunami:
+        f["tsunami_flag"] = 0
+    return f, False
 
-if has_tsunami:
-    if "only" in event_type.lower():
-        f = f[f["tsunami_flag"] == 0]
-    elif "tsunami" in event_type.lower():
-        f = f[f["tsunami_flag"] == 1]
+@st.cache_data
+def compute_kpis(filter_key: tuple) -> dict:
+    f, _ = apply_filters(*filter_key)
+
+    # One reduction over a contiguous 2D block instead of three column sums
+    total, deaths, injuries = f[["total_casualties", "deaths", "injuries"]].to_numpy().sum(axis=0, dtype=np.int64)
+    return {
+        "total_casualties": int(total),
+        "deaths": int(deaths),
+        "injuries": int(injuries),
+        "events": len(f),
+    }
+
+@st.cache_data
+def compute_trend(filter_key: tuple, metric: str) -> pd.DataFrame:
+    f, _ = apply_filters(*filter_key)
+
+    # Years are small ints: bincount sums per year in one pass, no hashing or sorting
+    years = f["year"].to_numpy(dtype=np.int64)
+    offset = years.min()
+    sums = np.bincount(years - offset, weights=f[metric].to_numpy())
+    seen = np.bincount(years - offset) > 0
+    return pd.DataFrame({
+        "year": np.arange(offset, offset + len(sums))[seen],
+        metric: sums[seen].astype(np.int64),
+    })
+
+TREND_MAX_POINTS = 800
+
+def lttb_downsample(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: return the indices of n_out points that keep
+    the visual shape of (x, y). First and last points are always kept.
+    """
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+
+        # Pick the point forming the largest triangle with the previous pick and the next bucket's mean
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+# Figures are memoized per (filter_key, metric) so reruns reuse already-built charts.
+# They use plotly.graph_objects directly (imported on first build) instead of plotly.express,
+# skipping px's DataFrame-to-figure pipeline and its import cost.
+SEVERITY_COLORS = {"Severe": "#ef4444", "Moderate": "#f59e0b", "Minor": "#10b981"}
+
+@st.cache_resource(max_entries=32)
+def build_map(filter_key: tuple, metric: str):
+    import plotly.graph_objects as go
+
+    f, _ = apply_filters(*filter_key)
+    bubble = f[metric].clip(lower=0).to_numpy() + 2
+
+    fig_map = go.Figure(go.Scattergeo(
+        lat=f["latitude"],
+        lon=f["longitude"],
+        mode="markers",
+        hovertext=f["location_name"],
+        hovertemplate=(
+            "<b>%{hovertext}</b><br><br>bubble=%{marker.size}<br>latitude=%{lat}"
+            "<br>longitude=%{lon}<br>magnitude=%{marker.color}<extra></extra>"
+        ),
+        marker=dict(
+            size=bubble,
+            sizemode="area",
+            sizeref=bubble.max() / 20 ** 2,  # same scaling as px (size_max=20)
+            color=f["magnitude"],
+            coloraxis="coloraxis",
+        ),
+    ))
+    fig_map.update_layout(
+        template="plotly_white",
+        geo=dict(projection_type="natural earth"),
+        coloraxis=dict(colorbar=dict(title=dict(text="magnitude"))),
+        margin=dict(l=0, r=0, t=0, b=0),
+        height=440
+    )
+    return fig_map
+
+@st.cache_resource(max_entries=32)
+def build_pie(filter_key: tuple):
+    import plotly.graph_objects as go
+
+    kpis = compute_kpis(filter_key)
+    fig_pie = go.Figure(go.Pie(
+        labels=["Deaths", "Injuries"],
+        values=[kpis["deaths"], kpis["injuries"]],
+        hole=0.6,
+        hovertemplate="Cat=%{label}<br>Val=%{value}<extra></extra>"
+    ))
+    fig_pie.update_layout(
+        piecolorway=["#1e293b", "#ef4444"],
+        margin=dict(l=18, r=18, t=18, b=18),
+        height=420,
+        showlegend=False
+    )
+    return fig_pie
+
+@st.cache_resource(max_entries=32)
+def build_trend(filter_key: tuple, metric: str):
+    import plotly.graph_objects as go
+
+    trend = compute_trend(filter_key, metric)
+    if len(trend) > TREND_MAX_POINTS:
+        # Long series: plot O(pixels) points, not O(rows)
+        trend = trend.iloc[lttb_downsample(trend["year"].to_numpy(), trend[metric].to_numpy(), TREND_MAX_POINTS)]
+
+    fig_line = go.Figure(go.Scatter(
+        x=trend["year"],
+        y=trend[metric],
+        mode="lines",
+        stackgroup="1",
+        line=dict(color="#3b82f6"),
+        hovertemplate=f"year=%{{x}}<br>{metric}=%{{y}}<extra></extra>"
+    ))
+    fig_line.update_layout(
+        template="plotly_white",
+        xaxis_title="year",
+        yaxis_title=metric,
+        margin=dict(l=0, r=0, t=10, b=0),
+        height=330
+    )
+    return fig_line
+
+@st.cache_resource(max_entries=32)
+def build_scatter(filter_key: tuple, metric: str):
+    import plotly.graph_objects as go
+
+    f, _ = apply_filters(*filter_key)
+    severity = f["severity"].to_numpy()
+    mag = f["magnitude"].to_numpy()
+    values = f[metric].to_numpy()
+
+    # One WebGL trace per severity present, like px's color grouping
+    fig_scatter = go.Figure()
+    for sev, color in SEVERITY_COLORS.items():
+        mask = severity == sev
+        if not mask.any():
+            continue
+        fig_scatter.add_trace(go.Scattergl(
+            x=mag[mask],
+            y=values[mask],
+            mode="markers",
+            name=sev,
+            legendgroup=sev,
+            showlegend=True,
+            marker=dict(color=color),
+            hovertemplate=f"severity={sev}<br>magnitude=%{{x}}<br>{metric}=%{{y}}<extra></extra>"
+        ))
+    fig_scatter.update_layout(
+        template="plotly_white",
+        xaxis_title="magnitude",
+        yaxis_title=metric,
+        legend_title_text="severity",
+        margin=dict(l=0, r=0, t=10, b=0),
+        height=330
+    )
+    return fig_scatter
+
+# Widget values as an immutable cache key; `metric` is kept out so switching it reuses f
+filter_key = (tuple(year_range), magnitude, tuple(severity_filter), only_with_casualties, event_type)
+f, matched = apply_filters(*filter_key)
+kpis = compute_kpis(filter_key)
 
 # ============================================================
 # 7) MAIN DISPLAY AREA)
 # ============================================================
+# Alert styling per single selected severity; any combination is MIXED
+ALERT_TABLE = {
+    frozenset({"Severe"}): ("alert-severe", "#b91c1c", "SEVERE"),
+    frozenset({"Moderate"}): ("alert-moderate", "#92400e", "MODERATE"),
+    frozenset({"Minor"}): ("alert-low", "#166534", "LOW"),
+}
+ALERT_MIXED = ("alert", "#334155", "MIXED")
+
 with display_col:
-    if f.empty:
+    if not matched:
         st.warning("No data matches these filters. Showing zeroed visuals.")
-        f = pd.DataFrame({
-            "year": [year_range[0]],
-            "latitude": [0],
-            "longitude": [0],
-            "magnitude": [magnitude],
-            "depth_km": [0],
-            "deaths": [0],
-            "injuries": [0],
-            "total_casualties": [0],
-            "severity": ["Minor"],
-            "location_name": ["No data"]
-        })
-        if has_tsunami:
-            f["tsunami_flag"] = 0
-
-    selected_severities = set(severity_filter)
-
-    if len(selected_severities) > 1:
-        alert_class = "alert"
-        severity_color = "#334155"
-        sev_label = "MIXED"
-    elif "Severe" in selected_severities:
-        alert_class = "alert-severe"
-        severity_color = "#b91c1c"
-        sev_label = "SEVERE"
-    elif "Moderate" in selected_severities:
-        alert_class = "alert-moderate"
-        severity_color = "#92400e"
-        sev_label = "MODERATE"
-    else:
-        alert_class = "alert-low"
-        severity_color = "#166534"
-        sev_label = "LOW"
-
-    peak = f.loc[f[metric].idxmax()]
+
+    alert_class, severity_color, sev_label = ALERT_TABLE.get(frozenset(severity_filter), ALERT_MIXED)
+
+    # Positional argmax: read the three peak fields without building a full row Series
+    metric_values = f[metric].to_numpy()
+    i = int(metric_values.argmax())
+    peak_metric = int(metric_values[i])
+    peak_loc = f["location_name"].iat[i]
+    peak_year = int(f["year"].iat[i])
 
     st.markdown(
         f"""
@@ -395,7 +618,7 @@ with display_col:
               Dominant Threat Level: {sev_label}
             </div>
             <div style="font-size:0.9rem; opacity:0.9;">
-              Peak Event: {int(peak[metric]):,} {metric.replace('_',' ')} in {peak.get('location_name','Unknown')} ({int(peak['year'])})
+              Peak Event: {peak_metric:,} {metric.replace('_',' ')} in {peak_loc} ({peak_year})
             </div>
           </div>
         </div>
@@ -419,10 +642,10 @@ with display_col:
                 unsafe_allow_html=True
             )
 
-    render_kpi(k1, "Total Casualties", f"{int(f['total_casualties'].sum()):,}", "Combined impact", "accent-red")
-    render_kpi(k2, "Fatalities", f"{int(f['deaths'].sum()):,}", "Confirmed deaths", "accent-dark")
-    render_kpi(k3, "Injuries", f"{int(f['injuries'].sum()):,}", "Medical cases", "accent-blue")
-    render_kpi(k4, "Event Count", f"{len(f):,}", "Filtered records", "accent-blue")
+    render_kpi(k1, "Total Casualties", f"{kpis['total_casualties']:,}", "Combined impact", "accent-red")
+    render_kpi(k2, "Fatalities", f"{kpis['deaths']:,}", "Confirmed deaths", "accent-dark")
+    render_kpi(k3, "Injuries", f"{kpis['injuries']:,}", "Medical cases", "accent-blue")
+    render_kpi(k4, "Event Count", f"{kpis['events']:,}", "Filtered records", "accent-blue")
 
     # Visuals Row 1
     v1, v2 = st.columns([1.5, 1], gap="medium")
@@ -430,37 +653,14 @@ with display_col:
     with v1:
         st.markdown('<div class="card"><strong>Geographic Impact</strong>', unsafe_allow_html=True)
 
-        map_df = f.copy()
-        map_df["bubble"] = map_df[metric].clip(lower=0) + 2
-
-        fig_map = px.scatter_geo(
-            map_df,
-            lat="latitude",
-            lon="longitude",
-            size="bubble",
-            color="magnitude",
-            projection="natural earth",
-            template="plotly_white",
-            hover_name="location_name"
-        )
-        fig_map.update_layout(margin=dict(l=0, r=0, t=0, b=0), height=440)
-        st.plotly_chart(fig_map, use_container_width=True)
+        st.plotly_chart(build_map(filter_key, metric), use_container_width=True)
 
         st.markdown('</div>', unsafe_allow_html=True)
 
     with v2:
         st.markdown('<div class="card"><strong>Casualty Mix</strong>', unsafe_allow_html=True)
 
-        dist = pd.DataFrame({"Cat": ["Deaths", "Injuries"], "Val": [f["deaths"].sum(), f["injuries"].sum()]})
-        fig_pie = px.pie(
-            dist,
-            names="Cat",
-            values="Val",
-            hole=0.6,
-            color_discrete_sequence=["#1e293b", "#ef4444"]
-        )
-        fig_pie.update_layout(margin=dict(l=18, r=18, t=18, b=18), height=420, showlegend=False)
-        st.plotly_chart(fig_pie, use_container_width=True)
+        st.plotly_chart(build_pie(filter_key), use_container_width=True)
 
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -470,32 +670,14 @@ with display_col:
     with v3:
         st.markdown('<div class="card"><strong>Temporal Trend</strong>', unsafe_allow_html=True)
 
-        trend = f.groupby("year")[metric].sum().reset_index()
-        fig_line = px.area(
-            trend,
-            x="year",
-            y=metric,
-            template="plotly_white",
-            color_discrete_sequence=["#3b82f6"]
-        )
-        fig_line.update_layout(margin=dict(l=0, r=0, t=10, b=0), height=330)
-        st.plotly_chart(fig_line, use_container_width=True)
+        st.plotly_chart(build_trend(filter_key, metric), use_container_width=True)
 
         st.markdown('</div>', unsafe_allow_html=True)
 
     with v4:
         st.markdown('<div class="card"><strong>Magnitude Correlation</strong>', unsafe_allow_html=True)
 
-        fig_scatter = px.scatter(
-            f,
-            x="magnitude",
-            y=metric,
-            color="severity",
-            template="plotly_white",
-            color_discrete_map={"Severe": "#ef4444", "Moderate": "#f59e0b", "Minor": "#10b981"}
-        )
-        fig_scatter.update_layout(margin=dict(l=0, r=0, t=10, b=0), height=330)
-        st.plotly_chart(fig_scatter, use_container_width=True)
+        st.plotly_chart(build_scatter(filter_key, metric), use_container_width=True)
 
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -504,6 +686,14 @@ with display_col:
 # ============================================================
 st.markdown('<div class="card"><strong>Filtered Data Preview</strong><p> limit to 25 event, download if you want to see more.</p></div>', unsafe_allow_html=True)
 
+@st.cache_data
+def export_csv(filter_key: tuple) -> bytes:
+    # Write straight into a bytes buffer: no intermediate str + encode copy
+    f, _ = apply_filters(*filter_key)
+    buf = io.BytesIO()
+    f.to_csv(buf, index=False, encoding="utf-8")
+    return buf.getvalue()
+
 cols_to_show = [
     "date", "location_name", "magnitude", "depth_km",
     "deaths", "injuries", "total_casualties", "severity"
@@ -518,12 +708,13 @@ else:
     # Only select columns that actually exist (extra safety)
     safe_cols = [c for c in cols_to_show if c in f.columns]
 
-    table_df = f[safe_cols].sort_values("date", ascending=False).head(25)
+    # Partial selection of the 25 latest events; no full sort of f
+    table_df = f.nlargest(25, "date")[safe_cols]
     st.dataframe(table_df, use_container_width=True, hide_index=True)
 
     st.download_button(
         "Export Current Filtered Results",
-        data=f.to_csv(index=False).encode("utf-8"),
+        data=export_csv(filter_key),
         file_name="mci_export.csv",
         mime="text/csv",
         use_container_width=True